@@ -0,0 +1,36 @@
+"""File access helpers shared by the rhydrator script and layoutviz."""
+
+from __future__ import annotations
+
+import mmap
+
+READAHEAD_MERGE_GAP = 64 * 1024
+"Byte ranges closer than this are merged into one read-ahead request"
+
+
+def advise_ranges(mapping: mmap.mmap, ranges: list[tuple[int, int]]):
+    """Ask the OS to start reading the given byte ranges of a mapped file
+
+    The ranges are sorted and merged when they are less than READAHEAD_MERGE_GAP
+    apart, so a handful of scattered envelopes turns into a few larger reads that
+    are in flight before the envelopes are parsed. No-op where madvise is not
+    available (Windows).
+
+    Args:
+        mapping (mmap.mmap): Mapping of the file
+        ranges (list[tuple[int, int]]): (offset, size) of each range
+    """
+    if not hasattr(mmap, "MADV_WILLNEED"):
+        return
+    merged: list[list[int]] = []
+    for seek, size in sorted(ranges):
+        if merged and seek <= merged[-1][1] + READAHEAD_MERGE_GAP:
+            merged[-1][1] = max(merged[-1][1], seek + size)
+        else:
+            merged.append([seek, seek + size])
+    for seek, end in merged:
+        # madvise needs a page-aligned start
+        start = seek - seek % mmap.PAGESIZE
+        stop = min(end, len(mapping))
+        if stop > start:
+            mapping.madvise(mmap.MADV_WILLNEED, start, stop - start)
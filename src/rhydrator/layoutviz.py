@@ -8,32 +8,52 @@ from __future__ import annotations
 import argparse
 import gzip
 import json
-import os
+import mmap
+import sys
 from collections import defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Literal, TypeAlias, TypedDict
-
+from typing import (
+    TYPE_CHECKING,
+    Literal,
+    NamedTuple,
+    TextIO,
+    TypeAlias,
+    TypedDict,
+)
+
+import numpy as np
 from rootfilespec.bootstrap import BOOTSTRAP_CONTEXT, ROOTFile
 from rootfilespec.bootstrap.RAnchor import ROOT3a3aRNTuple
 from rootfilespec.rntuple.RNTuple import RNTuple, SchemaDescription
 from rootfilespec.serializable import BufferContext, ReadBuffer
 
+from rhydrator._io import advise_ranges
+
+EVENT_BATCH_SIZE = 4096
+"Number of events formatted before each write when rendering a profile"
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from rootfilespec.rntuple.pagelist import PageListEnvelope
 
-class PageData(TypedDict):
+
+class PageData(NamedTuple):
     cluster: int
     offset: int
     size: int
     elements: int
 
 
-class ColumnData(TypedDict):
+class ColumnData(NamedTuple):
     id: int
     type: str
     pages: list[PageData]
 
 
 FieldColumnMap: TypeAlias = defaultdict[int, list[ColumnData]]
+FieldChildMap: TypeAlias = defaultdict[int, list[int]]
 
 
 class Frame(TypedDict):
@@ -43,7 +63,7 @@ class Frame(TypedDict):
     col: int | None
 
 
-class Event(TypedDict):
+class Event(NamedTuple):
     type: Literal["O", "C"]
     "Open or close event"
     frame: int
@@ -52,10 +72,10 @@ class Event(TypedDict):
     "Offset in file"
 
 
-class Span(TypedDict):
+class Span(NamedTuple):
     offset: int
     size: int
-    stack: list[int]
+    stack: tuple[int, ...]
 
 
 @dataclass
@@ -75,8 +95,8 @@ class ProfileBulder:
     "All frames in the profile"
     spans: list[Span] = field(default_factory=list)
     "All byte range spans in the file"
-    stack: list[int] = field(default_factory=list)
-    "Current stack of frame indices"
+    stack: tuple[int, ...] = ()
+    "Current stack of frame indices (immutable, so spans can share it without copying)"
     shared_frames: dict[tuple[str, str | None, int | None, int | None], int] = field(
         default_factory=dict
     )
@@ -84,10 +104,10 @@ class ProfileBulder:
 
     def push_frame(self, frame: Frame):
         self.frames.append(frame)
-        self.stack.append(len(self.frames) - 1)
+        self.stack = (*self.stack, len(self.frames) - 1)
 
     def pop_frame(self):
-        self.stack.pop()
+        self.stack = self.stack[:-1]
 
     def push_shared_frame(
         self,
@@ -97,7 +117,11 @@ class ProfileBulder:
         line: int | None = None,
         col: int | None = None,
     ):
-        self.stack.append(self.shared_frame_id(name, file=file, line=line, col=col))
+        self.push_frame_id(self.shared_frame_id(name, file=file, line=line, col=col))
+
+    def push_frame_id(self, frame_id: int):
+        """Push an existing frame (e.g. a shared frame ID looked up ahead of time)"""
+        self.stack = (*self.stack, frame_id)
 
     def shared_frame_id(
         self, name: str, *, file: str | None, line: int | None, col: int | None
@@ -123,151 +147,294 @@ class ProfileBulder:
             offset (int): Offset in the file
             size (int): Size of the span
         """
-        self.push_shared_frame(name)
-        self.spans.append(
-            {
-                "offset": offset,
-                "size": size,
-                "stack": self.stack.copy(),
-            }
+        self.add_span_raw(
+            self.shared_frame_id(name, file=None, line=None, col=None), offset, size
         )
-        self.stack.pop()
 
-    def render(self, endValue: int) -> dict:
-        """Render the profile as a dictionary suitable for JSON serialization
+    def add_span_raw(self, frame_id: int, offset: int, size: int):
+        """Add a span of bytes under an existing frame, skipping the shared frame lookup
+
+        Args:
+            frame_id (int): Frame index of the span
+            offset (int): Offset in the file
+            size (int): Size of the span
+        """
+        self.spans.append(Span(offset, size, (*self.stack, frame_id)))
+
+    def events(self) -> Iterator[Event]:
+        """Generate the open/close events of the profile, in file order
+
+        The spans are checked for overlaps as they are walked, so the events come
+        out ordered by offset without a separate validation pass.
 
-        Returns:
-            dict: Profile dictionary
+        Yields:
+            Event: Open and close events for every frame around each span
         """
         assert not self.stack, "Profile stack is not empty"
-        events: list[Event] = []
 
         stack: list[int] = []
         last_span_end = 0
+        opened, closed = 0, 0
         gaps: list[tuple[int, int]] = []
-        for span in sorted(self.spans, key=lambda s: s["offset"]):
-            if span["offset"] < last_span_end:
+        # stable sort by offset in numpy rather than through a Python key function
+        offsets = np.fromiter(
+            (span.offset for span in self.spans),
+            dtype=np.int64,
+            count=len(self.spans),
+        )
+        order = np.argsort(offsets, kind="stable")
+        for i in order.tolist():
+            span = self.spans[i]
+            if span.offset < last_span_end:
                 msg = f"Overlapping spans detected: {span=} starts before last span ended at {last_span_end}"
-                sstack = " > ".join(repr(self.frames[frame]) for frame in span["stack"])
+                sstack = " > ".join(repr(self.frames[frame]) for frame in span.stack)
                 msg += f"\nSpan stack: {sstack}"
                 cstack = " > ".join(repr(self.frames[frame]) for frame in stack)
                 msg += f"\nCurrent stack: {cstack}"
                 raise ValueError(msg)
-            if span["offset"] > last_span_end:
-                gaps.append((last_span_end, span["offset"] - last_span_end))
+            if span.offset > last_span_end:
+                gaps.append((last_span_end, span.offset - last_span_end))
             if stack:
                 # always close frames down to common ancestor
-                common = [
-                    i
-                    for i, (left, right) in enumerate(
-                        zip(stack, span["stack"], strict=False)
-                    )
-                    if left != right
-                ]
+                span_stack = span.stack
+                ncommon = min(len(stack), len(span_stack))
+                icommon = 0
+                while icommon < ncommon and stack[icommon] == span_stack[icommon]:
+                    icommon += 1
                 # and always close the last frame (last span must have ended)
-                icommon = min(common) if common else len(stack) - 1
+                icommon = min(icommon, len(stack) - 1)
                 stack, closing = stack[:icommon], stack[icommon:]
-                events.extend(
-                    {"type": "C", "frame": frame, "at": last_span_end}
-                    for frame in reversed(closing)
-                )
-                opening = span["stack"][icommon:]
+                for frame in reversed(closing):
+                    yield Event("C", frame, last_span_end)
+                closed += len(closing)
+                opening = span.stack[icommon:]
             else:
-                opening = span["stack"]
-            events.extend(
-                {"type": "O", "frame": frame, "at": span["offset"]} for frame in opening
-            )
+                opening = span.stack
+            for frame in opening:
+                yield Event("O", frame, span.offset)
+            opened += len(opening)
             stack.extend(opening)
-            last_span_end = span["offset"] + span["size"]
+            last_span_end = span.offset + span.size
 
-        events.extend(
-            {"type": "C", "frame": frame, "at": last_span_end}
-            for frame in reversed(stack)
-        )
+        for frame in reversed(stack):
+            yield Event("C", frame, last_span_end)
+        closed += len(stack)
+        assert opened == closed, "Unmatched open/close events"
 
         # most of these will be the 8-byte checksums after each envelope
-        # print(f"Detected {len(gaps)} gaps in file layout totaling {sum(size for _, size in gaps)} of {endValue} bytes")
+        # print(f"Detected {len(gaps)} gaps in file layout totaling {sum(size for _, size in gaps)} bytes")
 
-        opened, closed = 0, 0
-        offset = 0
-        for i, event in enumerate(events):
-            if event["type"] == "O":
-                opened += 1
-            else:
-                closed += 1
-            assert event["at"] >= offset, (
-                f"Events are out of order: {event=}, previous {events[i - 1]}"
-            )
-            offset = max(offset, event["at"])
-        assert opened == closed, "Unmatched open/close events"
+    def render(self, outfile: TextIO, endValue: int):
+        """Write the profile as speedscope JSON
+
+        The events are streamed to the output as they are generated rather than
+        collected first, so memory use does not grow with the number of events.
 
+        Args:
+            outfile (TextIO): Text stream to write the JSON document to
+            endValue (int): End of the profile (the file size)
+        """
         profile = {
             "type": "evented",
             "name": "RNTuple File Layout",
             "unit": "bytes",
             "startValue": 0,
             "endValue": endValue,
-            "events": events,
-        }
-        return {
-            "$schema": "https://www.speedscope.app/file-format-schema.json",
-            "shared": {
-                "frames": self.frames,
-            },
-            "profiles": [profile],
-            "exporter": "rhydrator.layoutviz",
         }
+        outfile.write(
+            '{"$schema": "https://www.speedscope.app/file-format-schema.json", '
+        )
+        outfile.write(f'"shared": {json.dumps({"frames": self.frames})}, ')
+        # reopen the profile object to append the events array last
+        outfile.write(f'"profiles": [{json.dumps(profile)[:-1]}, "events": [')
+
+        # events are written in batches: far fewer write calls, bounded memory
+        batch: list[str] = []
+        separator = ""
+        for event in self.events():
+            # events have fixed keys and int/str values, so format them directly
+            # (same text as json.dumps, several times faster)
+            batch.append(
+                f'{{"type": "{event.type}", "frame": {event.frame}, "at": {event.at}}}'
+            )
+            if len(batch) == EVENT_BATCH_SIZE:
+                outfile.write(separator + ", ".join(batch))
+                batch.clear()
+                separator = ", "
+        if batch:
+            outfile.write(separator + ", ".join(batch))
+
+        outfile.write(']}], "exporter": "rhydrator.layoutviz"}')
+
+
+@dataclass
+class SchemaIndex:
+    """Field and column attributes of an RNTuple schema, decoded once and indexed by ID"""
+
+    fieldNames: list[str]
+    fieldTypes: list[str]
+    topLevelFields: list[int]
+    "IDs of the fields that are their own parent (projected fields excluded)"
+    fieldChildren: FieldChildMap
+    "Child field IDs of each field (projected fields excluded)"
+    columnTypes: list[str]
+    columnFields: list[int]
+    "Field ID of each column"
+
+    @classmethod
+    def from_schema(cls, schema: SchemaDescription) -> SchemaIndex:
+        fieldDescriptions = schema.fieldDescriptions
+        columnDescriptions = schema.columnDescriptions
+        topLevelFields: list[int] = []
+        fieldChildren: FieldChildMap = defaultdict(list)
+        for fieldID, fieldDescription in enumerate(fieldDescriptions):
+            # TODO: fFlags should be an IntFlag (like TObjFlag)
+            if fieldDescription.fFlags & 0x2:
+                # skip projected fields (and so their subfields) when walking the schema
+                continue
+            parentID = fieldDescription.fParentFieldID
+            if parentID == fieldID:
+                topLevelFields.append(fieldID)
+            else:
+                fieldChildren[parentID].append(fieldID)
+        return cls(
+            fieldNames=[fd.fFieldName.fString.decode() for fd in fieldDescriptions],
+            # types repeat across fields and are used as shared frame keys
+            fieldTypes=[
+                sys.intern(fd.fTypeName.fString.decode()) for fd in fieldDescriptions
+            ],
+            topLevelFields=topLevelFields,
+            fieldChildren=fieldChildren,
+            columnTypes=[
+                repr(cd.fColumnType).removeprefix("ColumnType.")
+                for cd in columnDescriptions
+            ],
+            columnFields=[cd.fFieldID for cd in columnDescriptions],
+        )
+
+
+def cluster_pages(
+    pagelistEnvelopes: list[PageListEnvelope],
+) -> list[dict[int, list[PageData]]]:
+    """Group the pages of each cluster by column, dropping repeated pages
+
+    The page lists are flattened into parallel arrays (one entry per page) so
+    that deduplication and grouping run in numpy rather than per page in Python.
+    A page referenced more than once (same offset and size) is kept only at its
+    first occurrence.
+
+    Returns:
+        list: One dict per cluster, mapping column ID to its pages
+    """
+    # ple.pageLocations is [cluster][column][page]
+    clusterPages = [pc for ple in pagelistEnvelopes for pc in ple.pageLocations]
+    clusters: list[dict[int, list[PageData]]] = [{} for _ in clusterPages]
+    pageLists = [pl for pc in clusterPages for pl in pc]
+    counts = np.fromiter((len(pl) for pl in pageLists), dtype=np.int64)
+    npages = int(counts.sum())
+    if npages == 0:
+        return clusters
+
+    allPages = [page for pl in pageLists for page in pl]
+    offsets = np.fromiter(
+        (page.locator.offset for page in allPages),  # type: ignore[attr-defined]
+        dtype=np.int64,
+        count=npages,
+    )
+    sizes = np.fromiter(
+        (page.locator.size for page in allPages), dtype=np.int64, count=npages
+    )
+    elements = np.fromiter(
+        (page.fNElements for page in allPages), dtype=np.int64, count=npages
+    )
+    clusterIds = np.repeat(
+        np.repeat(np.arange(len(clusterPages)), [len(pc) for pc in clusterPages]),
+        counts,
+    )
+    columnIds = np.repeat(
+        np.concatenate([np.arange(len(pc)) for pc in clusterPages]), counts
+    )
+
+    # lexsort is stable, so the first of each run of equal (offset, size) is the first occurrence
+    order = np.lexsort((sizes, offsets))
+    first = np.ones(npages, dtype=bool)
+    first[1:] = (np.diff(offsets[order]) != 0) | (np.diff(sizes[order]) != 0)
+    # back in file traversal order, which is already grouped by (cluster, column)
+    keep = np.sort(order[first])
+
+    keptClusters, keptColumns = clusterIds[keep], columnIds[keep]
+    bounds = (
+        np.flatnonzero((np.diff(keptClusters) != 0) | (np.diff(keptColumns) != 0)) + 1
+    )
+    for group in np.split(keep, bounds):
+        clusterId = int(clusterIds[group[0]])
+        clusters[clusterId][int(columnIds[group[0]])] = [
+            PageData(clusterId, offset, size, nelem)
+            for offset, size, nelem in zip(
+                offsets[group].tolist(),
+                sizes[group].tolist(),
+                elements[group].tolist(),
+                strict=True,
+            )
+        ]
+    return clusters
 
 
 def descend(
     profile: ProfileBulder,
-    schema: SchemaDescription,
+    schema: SchemaIndex,
     fieldColumns: FieldColumnMap,
     fieldID: int,
+    pageFrame: int,
+    columnFrames: list[int],
 ):
-    fieldDescription = schema.fieldDescriptions[fieldID]
-    # TODO: fFlags should be an IntFlag (like TObjFlag)
-    if fieldDescription.fFlags & 0x2:
-        # skip projected fields
-        return
-    field_name = fieldDescription.fFieldName.fString.decode()
-    field_type = fieldDescription.fTypeName.fString.decode()
-    if profile.config.unique_fields:
-        profile.push_frame(
-            {
-                "name": f"Field {fieldID}: {field_name}",
-                "file": f"{field_type}",
-                "line": None,
-                "col": None,
-            },
-        )
-    else:
-        profile.push_shared_frame(field_name, file=field_type)
-    for column in fieldColumns.get(fieldID, []):
-        if profile.config.unique_columns:
+    """Add the pages of a field and of all its subfields to the profile
+
+    The field hierarchy is walked with an explicit stack of (fieldID, leaving)
+    entries rather than by recursion; a field's frame is popped when its
+    leaving entry comes off the stack, after all of its subfields.
+    """
+    work: list[tuple[int, bool]] = [(fieldID, False)]
+    while work:
+        fieldID, leaving = work.pop()
+        if leaving:
+            profile.pop_frame()
+            continue
+        field_name = schema.fieldNames[fieldID]
+        field_type = schema.fieldTypes[fieldID]
+        if profile.config.unique_fields:
             profile.push_frame(
                 {
-                    "name": f"Column {column['id']}: {column['type']}",
-                    "file": None,
+                    "name": f"Field {fieldID}: {field_name}",
+                    "file": f"{field_type}",
                     "line": None,
                     "col": None,
                 },
             )
         else:
-            profile.push_shared_frame(f"Column {column['type']}")
-        for page in column["pages"]:
-            profile.add_span(
-                "Page",  # (cluster {page['cluster']})
-                offset=page["offset"],
-                size=page["size"],
-            )
-        profile.pop_frame()
-
-    for childID, childDescription in enumerate(schema.fieldDescriptions):
-        if childDescription.fParentFieldID != fieldID or childID == fieldID:
-            continue
-        descend(profile, schema, fieldColumns, childID)
-    profile.pop_frame()
+            profile.push_shared_frame(field_name, file=field_type)
+        for column in fieldColumns.get(fieldID, []):
+            if profile.config.unique_columns:
+                profile.push_frame(
+                    {
+                        "name": f"Column {column.id}: {column.type}",
+                        "file": None,
+                        "line": None,
+                        "col": None,
+                    },
+                )
+            else:
+                profile.push_frame_id(columnFrames[column.id])
+            for page in column.pages:
+                profile.add_span_raw(pageFrame, page.offset, page.size)
+            profile.pop_frame()
+
+        work.append((fieldID, True))
+        # reversed, so that children are visited in order
+        work.extend(
+            (childID, False)
+            for childID in reversed(schema.fieldChildren.get(fieldID, []))
+        )
 
 
 def read(path: Path, config: Config):
@@ -281,171 +448,166 @@ def read(path: Path, config: Config):
         }
     )
     with path.open("rb") as filehandle:
+        # the mapping outlives the file handle; it is paged in lazily by the OS
+        # and every fetch below is a zero-copy slice of it rather than a seek + read
+        mapping = mmap.mmap(filehandle.fileno(), 0, access=mmap.ACCESS_READ)
+    data = memoryview(mapping)
+    file_size = len(mapping)
+
+    def fetch_data(seek: int, size: int):
+        return ReadBuffer(
+            data[seek : seek + size],
+            0,
+            BOOTSTRAP_CONTEXT,
+            BufferContext(abspos=seek),
+        )
 
-        def fetch_data(seek: int, size: int):
-            filehandle.seek(seek)
-            return ReadBuffer(
-                memoryview(filehandle.read(size)),
-                0,
-                BOOTSTRAP_CONTEXT,
-                BufferContext(abspos=seek),
-            )
+    # Get TFile Header
+    buffer = fetch_data(0, 512)
+    file, _ = ROOTFile.read(buffer)
+    profile.add_span(
+        "ROOTFile",
+        offset=0,
+        size=file.header.fBEGIN,
+    )
 
-        # Get TFile Header
-        buffer = fetch_data(0, 512)
-        file, _ = ROOTFile.read(buffer)
+    # Get TFile object (root TDirectory)
+    tfile = file.get_TFile(fetch_data)
+
+    # usually the directory tkeylist and the streamer info are adjacent at the end of the file
+    profile.add_span(
+        "TKeyList",
+        offset=tfile.rootdir.fSeekKeys,
+        size=tfile.rootdir.header.fNbytesKeys,
+    )
+    profile.add_span(
+        "TStreamerInfo",
+        offset=file.header.fSeekInfo,
+        size=file.header.fNbytesInfo,
+    )
+
+    # Get TKeyList (List of all TKeys in the TDirectory)
+    keylist = tfile.get_KeyList(fetch_data)
+
+    #### Get RNTuple Info
+    # Only RNTuple Anchor TKeys are visible (i.e. in TKeyList); ClassName = ROOT::RNTuple
+    anchors = {
+        name: tkey.read_object(fetch_data, ROOT3a3aRNTuple)
+        for name, tkey in keylist.items()
+        if tkey.fClassName.fString == b"ROOT::RNTuple"
+    }
+    # the envelope locations are known from the anchors, so have them all paged in
+    # up front rather than faulting them in one at a time as each RNTuple is parsed
+    advise_ranges(
+        mapping,
+        [(anchor.fSeekHeader, anchor.fNBytesHeader) for anchor in anchors.values()]
+        + [(anchor.fSeekFooter, anchor.fNBytesFooter) for anchor in anchors.values()],
+    )
+
+    for name, tkey in keylist.items():
         profile.add_span(
-            "ROOTFile",
-            offset=0,
-            size=file.header.fBEGIN,
+            f"{name}: {tkey.fClassName.fString.decode()}",
+            offset=tkey.fSeekKey,
+            size=tkey.header.fNbytes,
         )
+        # Check for RNTuple Anchors
+        if name not in anchors:
+            continue
+        anchor = anchors[name]
 
-        def fetch_cached(seek: int, size: int):
-            if seek + size <= len(buffer):
-                return buffer[seek : seek + size]
-            return fetch_data(seek, size)
-
-        # Get TFile object (root TDirectory)
-        tfile = file.get_TFile(fetch_cached)
+        profile.push_frame(
+            {
+                "name": f"RNTuple: {name}",
+                "file": None,
+                "line": None,
+                "col": None,
+            }
+        )
 
-        # usually the directory tkeylist and the streamer info are adjacent at the end of the file
         profile.add_span(
-            "TKeyList",
-            offset=tfile.rootdir.fSeekKeys,
-            size=tfile.rootdir.header.fNbytesKeys,
+            "HeaderEnvelope",
+            offset=anchor.fSeekHeader,
+            size=anchor.fNBytesHeader,
         )
         profile.add_span(
-            "TStreamerInfo",
-            offset=file.header.fSeekInfo,
-            size=file.header.fNbytesInfo,
+            "FooterEnvelope",
+            offset=anchor.fSeekFooter,
+            size=anchor.fNBytesFooter,
         )
 
-        # Get TKeyList (List of all TKeys in the TDirectory)
-        keylist = tfile.get_KeyList(fetch_data)
-
-        #### Get RNTuple Info
-        # Only RNTuple Anchor TKeys are visible (i.e. in TKeyList); ClassName = ROOT::RNTuple
-        for name, tkey in keylist.items():
+        rntuple = RNTuple.from_anchor(anchor, fetch_data)
+        for cg in rntuple.footerEnvelope.clusterGroups:
+            link = cg.pagelistLink
             profile.add_span(
-                f"{name}: {tkey.fClassName.fString.decode()}",
-                offset=tkey.fSeekKey,
-                size=tkey.header.fNbytes,
+                "PageListEnvelope",
+                # TODO: add local_offset() to base class in rootfilespec
+                offset=link.locator.offset,  # type: ignore[attr-defined]
+                size=link.locator.size,
             )
-            # Check for RNTuple Anchors
-            if tkey.fClassName.fString != b"ROOT::RNTuple":
-                continue
-            ### Get RNTuple Anchor Object
-            anchor = tkey.read_object(fetch_data, ROOT3a3aRNTuple)
 
-            profile.push_frame(
-                {
-                    "name": f"RNTuple: {name}",
-                    "file": None,
-                    "line": None,
-                    "col": None,
-                }
-            )
-
-            profile.add_span(
-                "HeaderEnvelope",
-                offset=anchor.fSeekHeader,
-                size=anchor.fNBytesHeader,
-            )
-            profile.add_span(
-                "FooterEnvelope",
-                offset=anchor.fSeekFooter,
-                size=anchor.fNBytesFooter,
-            )
-
-            rntuple = RNTuple.from_anchor(anchor, fetch_data)
-            for cg in rntuple.footerEnvelope.clusterGroups:
-                link = cg.pagelistLink
-                profile.add_span(
-                    "PageListEnvelope",
-                    # TODO: add local_offset() to base class in rootfilespec
-                    offset=link.locator.offset,  # type: ignore[attr-defined]
-                    size=link.locator.size,
-                )
-
-            schemaDescription = rntuple.schemaDescription
-
-            clusters: list[dict[int, list[PageData]]] = []
-            seen_pages: set[tuple[int, int]] = set()
-
-            for ple in rntuple.pagelistEnvelopes:
-                # ple.pageLocations is [cluster][column][page]
-                for pc in ple.pageLocations:
-                    columnPages: defaultdict[int, list[PageData]] = defaultdict(list)
-                    for columnId, pl in enumerate(pc):
-                        for page in pl:
-                            tup = (page.locator.offset, page.locator.size)  # type: ignore[attr-defined]
-                            if tup in seen_pages:
-                                continue
-                            seen_pages.add(tup)
-                            columnPages[columnId].append(
-                                {
-                                    "offset": page.locator.offset,  # type: ignore[attr-defined]
-                                    "size": page.locator.size,
-                                    "elements": page.fNElements,
-                                }
-                            )
-                    clusters.append(columnPages)
-
-            pagedata: list[tuple[str, int, int]] = []
-            for columnId, columnDescription in enumerate(
-                schemaDescription.columnDescriptions
+        schema = SchemaIndex.from_schema(rntuple.schemaDescription)
+
+        clusters = cluster_pages(rntuple.pagelistEnvelopes)
+
+        # one pass over the columns fills every cluster's field -> columns map
+        # and collects the page data rows (ordered by column, then cluster)
+        clusterFieldColumns: list[FieldColumnMap] = [
+            defaultdict(list) for _ in clusters
+        ]
+        pagedata: list[str] = ["ColumnType,PageSize,NumElements\n"]
+        for columnId, (ctype, columnField) in enumerate(
+            zip(schema.columnTypes, schema.columnFields, strict=True)
+        ):
+            for columnPages, fieldColumns in zip(
+                clusters, clusterFieldColumns, strict=True
             ):
-                ctype = repr(columnDescription.fColumnType).removeprefix("ColumnType.")
+                pages = columnPages.get(columnId, [])
+                fieldColumns[columnField].append(ColumnData(columnId, ctype, pages))
                 pagedata.extend(
-                    (ctype, page["size"], page["elements"])
-                    for columnPages in clusters
-                    for page in columnPages.get(columnId, [])
+                    [f"{ctype},{page.size},{page.elements}\n" for page in pages]
                 )
-            with Path(f"pagedata_{name}.csv").open("w") as pagedatafile:
-                pagedatafile.write("ColumnType,PageSize,NumElements\n")
-                for ctype, size, elements in pagedata:
-                    pagedatafile.write(f"{ctype},{size},{elements}\n")
-
-            topLevelFields = [
-                fieldID
-                for fieldID, fieldDescription in enumerate(
-                    schemaDescription.fieldDescriptions
+        # a single write of the joined rows, rather than one write per page
+        with Path(f"pagedata_{name}.csv").open("w") as pagedatafile:
+            pagedatafile.write("".join(pagedata))
+
+        # look up the frames shared by every page once, not once per page
+        pageFrame = profile.shared_frame_id("Page", file=None, line=None, col=None)
+        columnFrames = (
+            []
+            if profile.config.unique_columns
+            else [
+                profile.shared_frame_id(
+                    f"Column {ctype}", file=None, line=None, col=None
                 )
-                if fieldDescription.fParentFieldID == fieldID
+                for ctype in schema.columnTypes
             ]
+        )
 
-            for clusterId, pages in enumerate(clusters):
-                if profile.config.unique_clusters:
-                    profile.push_shared_frame(f"Cluster {clusterId}")
-                else:
-                    profile.push_shared_frame("Cluster")
-                fieldColumns: FieldColumnMap = defaultdict(list)
-                for columnId, columnDescription in enumerate(
-                    schemaDescription.columnDescriptions
-                ):
-                    ctype = repr(columnDescription.fColumnType).removeprefix(
-                        "ColumnType."
-                    )
-                    fieldColumns[columnDescription.fFieldID].append(
-                        {
-                            "id": columnId,
-                            "type": ctype,
-                            "pages": pages.get(columnId, []),
-                        }
-                    )
-
-                for fieldID in topLevelFields:
-                    descend(profile, schemaDescription, fieldColumns, fieldID)
-                profile.pop_frame()  # Cluster
-            profile.pop_frame()  # RNTuple
-
-        profile.pop_frame()
-        filehandle.seek(0, os.SEEK_END)
-        file_size = filehandle.tell()
-
-    out = profile.render(endValue=file_size)
-    with gzip.open(path.with_suffix(".layout.json.gz"), "wt") as outfile:
-        json.dump(out, outfile)
+        for clusterId, fieldColumns in enumerate(clusterFieldColumns):
+            if profile.config.unique_clusters:
+                profile.push_shared_frame(f"Cluster {clusterId}")
+            else:
+                profile.push_shared_frame("Cluster")
+            for fieldID in schema.topLevelFields:
+                descend(profile, schema, fieldColumns, fieldID, pageFrame, columnFrames)
+            profile.pop_frame()  # Cluster
+        profile.pop_frame()  # RNTuple
+
+    profile.pop_frame()
+
+    # spans are validated while the events stream out, so render into a sibling file and
+    # move it into place only once it is complete; an invalid layout then leaves any
+    # previous output untouched instead of a truncated, partial file
+    outpath = path.with_suffix(".layout.json.gz")
+    tmppath = outpath.with_name(f"{outpath.name}.tmp")
+    try:
+        # gzip's default level 9 is ~3x slower than level 6 for a negligible size gain
+        with gzip.open(tmppath, "wt", compresslevel=6) as outfile:
+            profile.render(outfile, endValue=file_size)
+    except BaseException:
+        tmppath.unlink(missing_ok=True)
+        raise
+    tmppath.replace(outpath)
 
 
 def main():
@@ -477,3 +639,7 @@ def main():
         unique_clusters=args.unique_clusters,
     )
     read(args.filename, config)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,98 +1,215 @@
-# ruff: noqa: T201, RUF059, F841, PERF102, PERF401
+# ruff: noqa: T201, RUF059, F841, PERF102
+import csv
+import mmap
+import sys
+from collections.abc import Callable
+from contextlib import ExitStack
+from operator import attrgetter
 from pathlib import Path
+from typing import NamedTuple
 
+import numpy as np
 from rootfilespec.bootstrap import BOOTSTRAP_CONTEXT, ROOTFile
 from rootfilespec.bootstrap.RAnchor import ROOT3a3aRNTuple
-from rootfilespec.bootstrap.strings import RString
 from rootfilespec.rntuple.pagelist import PageListEnvelope
 from rootfilespec.rntuple.RNTuple import RNTuple, SchemaDescription
 from rootfilespec.rntuple.schema import (
     FIELD_STRUCTURAL_ROLES,
     AliasColumnDescription,
     ColumnDescription,
+    ColumnType,
     FieldDescription,
 )
 from rootfilespec.serializable import BufferContext, ReadBuffer
 
+from rhydrator._io import advise_ranges
+
+# column type names (repr without the "ColumnType." prefix), looked up per column
+_COLUMN_TYPE_NAMES = {column_type: column_type.name for column_type in ColumnType}
+
+# decoded flags of a field or column with no flag bits set (the common case)
+_NO_FLAGS = ("", False, False, False)
+# all the flag bits that are decoded, to reject fields/columns without any in one test
+_FIELD_FLAGS_MASK = 0x7  # repetitive | projected | type checksum
+_COLUMN_FLAGS_MASK = 0x3  # deferred | value range
+
+
+def _decode_field_flags(field: FieldDescription) -> tuple[str, bool, bool, bool]:
+    flags = field.fFlags
+    if not flags & _FIELD_FLAGS_MASK:
+        return _NO_FLAGS
+    isRepetitive = bool(flags & 0x1)
+    isProjected = bool(flags & 0x2)
+    hasTypeChecksum = bool(flags & 0x4)
+    flag_list = []
+    if isRepetitive:
+        flag_list.append(f"Repetitive (Array Size: {field.fArraySize})")
+    if isProjected:
+        flag_list.append(f"Projected (Source Field ID: {field.fSourceFieldID})")
+    if hasTypeChecksum:
+        flag_list.append(f"Type Checksum ({field.fTypeChecksum})")
+    return (
+        ", ".join(flag_list) if flag_list else "",
+        isRepetitive,
+        isProjected,
+        hasTypeChecksum,
+    )
+
+
+def _decode_column_flags(column: ColumnDescription) -> tuple[str, bool, bool, bool]:
+    flags = column.fFlags
+    if not flags & _COLUMN_FLAGS_MASK:
+        return _NO_FLAGS
+    isDeferred = bool(flags & 0x1)
+    isSuppressed = False  # True if isDeferred and first element index is negative
+    hasValueRange = bool(flags & 0x2)
+    flag_list = []
+    if isDeferred:
+        if column.fFirstElementIndex is None:
+            msg = "Column with deferred flag set but fFirstElementIndex is None"
+            raise ValueError(msg)
+        isSuppressed = column.fFirstElementIndex < 0
+        flag_list.append(
+            f"Deferred (first element ind: {column.fFirstElementIndex}{', suppressed' if isSuppressed else ''})"
+        )
+    if hasValueRange:
+        flag_list.append(
+            f"Has Value Range (min: {column.fMinValue}, max: {column.fMaxValue})"
+        )
+    return (
+        ", ".join(flag_list) if flag_list else "",
+        isDeferred,
+        isSuppressed,
+        hasValueRange,
+    )
+
+
+# indentation of each tree depth in the text files, shared by all the writers;
+# _iter_tree extends it whenever it walks deeper than the table goes
+_INDENTS = ["  " * depth for depth in range(64)]
+
+
+def _iter_tree(tree: dict):
+    """
+    Walks a field tree depth-first (pre-order) with an explicit stack instead of recursion.
+
+    Args:
+        tree (dict): Map of field_id -> node, where each node holds its children in node["children"] (None if it has none).
+
+    Yields:
+        tuple[int, dict, int]: The field ID, node and depth of each node. _INDENTS always covers the depth.
+    """
+    stack = [(iter(tree.items()), 0)]
+    while stack:
+        items, indent = stack[-1]
+        entry = next(items, None)
+        if entry is None:
+            stack.pop()
+            continue
+        fid, info = entry
+        yield fid, info, indent
+        if info["children"]:
+            if indent + 1 == len(_INDENTS):
+                _INDENTS.append("  " * (indent + 1))
+            stack.append((iter(info["children"].items()), indent + 1))
+
 
 def get_field_to_page_map(
     schema_description: SchemaDescription,
     pagelist_envelopes: list[PageListEnvelope],
     filepath="",
 ) -> dict:
-    def decode_string(rstring: RString) -> str:
-        return rstring.fString.decode("utf-8")
-
     field_descriptions = schema_description.fieldDescriptions
     column_descriptions = schema_description.columnDescriptions
     alias_column_descriptions = schema_description.aliasColumnDescriptions
     extra_type_informations = schema_description.extraTypeInformations
 
-    def get_field_tree(field_descriptions: list[FieldDescription], filepath="") -> dict:
+    def get_field_tree(field_descriptions: list[FieldDescription]) -> tuple[dict, dict]:
         """
         Constructs a tree representation of field descriptions based on their parent-child relationships.
-        Optionally writes the tree structure to a specified file.
 
         Args:
             field_descriptions (list): A list of FieldDescription objects.
-            filepath (str, optional): The file path to write the tree structure. Defaults to an empty string (no file output).
 
         Returns:
-            dict: A nested dictionary representing the tree structure of fields.
+            tuple[dict, dict]: A nested dictionary representing the tree structure of fields,
+                and a flat map of field_id -> node covering every field in the tree.
         """
 
-        def decode_field_flags(field: FieldDescription) -> tuple[str, bool, bool, bool]:
-            isRepetitive = bool(field.fFlags & 0x1)
-            isProjected = bool(field.fFlags & 0x2)
-            hasTypeChecksum = bool(field.fFlags & 0x4)
-            flag_list = []
-            if isRepetitive:
-                flag_list.append(f"Repetitive (Array Size: {field.fArraySize})")
-            if isProjected:
-                flag_list.append(f"Projected (Source Field ID: {field.fSourceFieldID})")
-            if hasTypeChecksum:
-                flag_list.append(f"Type Checksum ({field.fTypeChecksum})")
-            return (
-                ", ".join(flag_list) if flag_list else "",
-                isRepetitive,
-                isProjected,
-                hasTypeChecksum,
-            )
-
         tree = {}
         # map of field_id -> node dict (allows attaching children to any ancestor, not only top-level)
         nodes = {}
 
-        for field_id, field in enumerate(field_descriptions):
-            parent_id = field.fParentFieldID
-            field_structural_role = FIELD_STRUCTURAL_ROLES.get(
-                field.fStructuralRole, "Unknown"
-            )
-            field_flags, isRepetitive, isProjected, hasTypeChecksum = (
-                decode_field_flags(field)
+        # decode all the field strings up front, one comprehension per attribute
+        field_names = [f.fFieldName.fString.decode("utf-8") for f in field_descriptions]
+        field_types = [f.fTypeName.fString.decode("utf-8") for f in field_descriptions]
+        field_type_aliases = [
+            f.fTypeAlias.fString.decode("utf-8") for f in field_descriptions
+        ]
+        field_descs = [
+            f.fFieldDescription.fString.decode("utf-8") for f in field_descriptions
+        ]
+
+        # gather the numeric attributes into arrays so they can be tested for all fields at once
+        nfields = len(field_descriptions)
+        parent_ids = np.fromiter(
+            (f.fParentFieldID for f in field_descriptions),
+            dtype=np.int64,
+            count=nfields,
+        )
+        flag_bits = np.fromiter(
+            (f.fFlags for f in field_descriptions), dtype=np.int64, count=nfields
+        )
+        role_ids = np.fromiter(
+            (f.fStructuralRole for f in field_descriptions),
+            dtype=np.int64,
+            count=nfields,
+        )
+        # (as python ints: numpy scalars would leak into the node maps as keys)
+        parents = parent_ids.tolist()
+        is_top_level = (parent_ids == np.arange(nfields)).tolist()
+        get_role = FIELD_STRUCTURAL_ROLES.get
+        roles = [get_role(role, "Unknown") for role in role_ids.tolist()]
+        # only the few fields with any flag bit set need their flags decoded
+        decoded_flags = [_NO_FLAGS] * nfields
+        for flagged_id in np.flatnonzero(flag_bits & _FIELD_FLAGS_MASK).tolist():
+            decoded_flags[flagged_id] = _decode_field_flags(
+                field_descriptions[flagged_id]
             )
 
-            field_name = decode_string(field.fFieldName)
-            field_type = decode_string(field.fTypeName)
-            field_type_alias = decode_string(field.fTypeAlias)
-            if field_type_alias:
-                field_type += f", alias: {field_type_alias}"
-            field_description = decode_string(field.fFieldDescription)
-            if field_description:
-                field_type += f", desc: {field_description}"
+        for field_id in range(nfields):
+            parent_id = parents[field_id]
+            field_structural_role = roles[field_id]
+            field_flags, isRepetitive, isProjected, hasTypeChecksum = decoded_flags[
+                field_id
+            ]
+
+            field_name = field_names[field_id]
+            field_type = field_types[field_id]
+            field_type_alias = field_type_aliases[field_id]
+            field_description = field_descs[field_id]
+            # most fields have neither an alias nor a description
+            if field_type_alias or field_description:
+                type_parts = [field_type]
+                if field_type_alias:
+                    type_parts.append(f"alias: {field_type_alias}")
+                if field_description:
+                    type_parts.append(f"desc: {field_description}")
+                field_type = ", ".join(type_parts)
 
             # create node for this field and store it in nodes so children or projections can find it later
-            node = {
+            # (most fields are leaves: their children/projections dicts are only created when first needed)
+            node: dict = {
                 "name": field_name,
                 "role": field_structural_role,
                 "flags": field_flags,
                 "type": field_type,
-                "children": {},
-                "projections": {},
+                "children": None,
+                "projections": None,
             }
             nodes[field_id] = node
 
-            if parent_id == field_id:
+            if is_top_level[field_id]:
                 # This is a top-level field
                 tree[field_id] = node
             else:
@@ -103,7 +220,9 @@ def get_field_to_page_map(
                 ):  # Parent not yet added; should not happen because children come after parents
                     msg = f"Error building field tree: Parent ID {parent_id} for field ID {field_id} not found."
                     raise ValueError(msg)
-                parent_node["children"][field_id] = node  # type: ignore[index]
+                if parent_node["children"] is None:
+                    parent_node["children"] = {}
+                parent_node["children"][field_id] = node
 
             # # below code for building tree with projections inline
             # if not isProjected: # These are physical fields in the tree
@@ -124,216 +243,64 @@ def get_field_to_page_map(
             #     if source_node is None:
             #         msg = f"Error building field tree: Source Field ID {source_field_id} for projected field ID {field_id} not found."
             #         raise ValueError(msg)
+            #     if source_node["projections"] is None:
+            #         source_node["projections"] = {}
             #     source_node["projections"][field_id] = node
 
-        if filepath:
-            filepath_field = f"{filepath}_field_tree.txt"
-
-            def write_tree(node, indent=0):
-                for fid, info in node.items():
-                    # line = "  " * indent + f"- [{fid}] {info['name']}: Role: {info['role']}; ({info['type']})\n"
-                    line = "  " * indent + f"- [{fid}] {info['name']}: {info['role']}"
-                    if info["flags"]:
-                        line += f" [{info['flags']}]"
-                    if info["type"]:
-                        line += f" ({info['type']})"
-                    if info["projections"]:
-                        line += " {Projections: "
-                        proj_list = []
-                        for pid, pinfo in info["projections"].items():
-                            proj_str = f"[{pid}] {pinfo['name']}"
-                            if pinfo["flags"]:
-                                proj_str += f" [{pinfo['flags']}]"
-                            if pinfo["type"]:
-                                proj_str += f" ({pinfo['type']})"
-                            proj_list.append(proj_str)
-                        line += "; ".join(proj_list) + "}"
-                    line += "\n"
-                    f.write(line)
-                    write_tree(info["children"], indent + 1)
-
-            with Path(filepath_field).open("w") as f:
-                write_tree(tree)
-            print(f"Field tree written to '{filepath_field}'")
-        return tree
+        return tree, nodes
 
     # end get_field_tree()
 
-    field_tree = get_field_tree(field_descriptions, filepath=filepath)
+    field_tree, field_id_to_node = get_field_tree(field_descriptions)
 
     # assign columns to fields in the field tree. update the field tree nodes to include list of column IDs along with column info
     def map_columns_to_fields(
         column_descriptions: list[ColumnDescription],
         alias_column_descriptions: list[AliasColumnDescription],
-        field_tree: dict,
-        filepath="",
+        field_id_to_node: dict,
     ) -> dict:
         """
         Maps columns to fields in the field tree based on field IDs.
-        Takes the output of get_field_tree and adds column information to the corresponding field nodes.
+        Takes the flat field_id -> node map built by get_field_tree and adds column information
+        to the corresponding field nodes.
         """
 
-        field_id_to_node = {}
-
-        # recursive function to build a map of field_id to node in the field tree
-        #   helps with handling nested fields
-        def build_field_id_map(node):
-            for fid, info in node.items():
-                field_id_to_node[fid] = info
-                build_field_id_map(info["children"])
-
-        build_field_id_map(field_tree)
-
-        def decode_column_flags(
-            column: ColumnDescription,
-        ) -> tuple[str, bool, bool, bool]:
-            isDeferred = bool(column.fFlags & 0x1)
-            isSuppressed = (
-                False  # True if isDeferred and first element index is negative
-            )
-            hasValueRange = bool(column.fFlags & 0x2)
-            flag_list = []
-            if isDeferred:
-                if column.fFirstElementIndex is None:
-                    msg = "Column with deferred flag set but fFirstElementIndex is None"
-                    raise ValueError(msg)
-                isSuppressed = column.fFirstElementIndex < 0
-                flag_list.append(
-                    f"Deferred (first element ind: {column.fFirstElementIndex}{', suppressed' if isSuppressed else ''})"
-                )
-            if hasValueRange:
-                flag_list.append(
-                    f"Has Value Range (min: {column.fMinValue}, max: {column.fMaxValue})"
-                )
-            return (
-                ", ".join(flag_list) if flag_list else "",
-                isDeferred,
-                isSuppressed,
-                hasValueRange,
-            )
+        column_types = [
+            _COLUMN_TYPE_NAMES[column.fColumnType] for column in column_descriptions
+        ]
 
         # map columns to fields in the field tree
         for col_id, column in enumerate(column_descriptions):
-            column_type = repr(column.fColumnType)
-            column_type = column_type.replace(
-                "ColumnType.", ""
-            )  # column_type always starts with "ColumnType.", strip that off for brevity
+            column_type = column_types[col_id]
             column_field_id = column.fFieldID
-            column_flags, isDeferred, isSuppressed, hasValueRange = decode_column_flags(
-                column
+            column_flags, isDeferred, isSuppressed, hasValueRange = (
+                _decode_column_flags(column)
             )
             column_rep_index = column.fRepresentationIndex
-            if column_field_id in field_id_to_node:
-                node = field_id_to_node[column_field_id]
-                if "columns" not in node:
-                    node["columns"] = []
-                node["columns"].append(
-                    {
-                        "column_id": col_id,
-                        "type": column_type,
-                        "flags": column_flags,
-                        "rep_index": column_rep_index,
-                    }
-                )
-            else:
+            node = field_id_to_node.get(column_field_id)
+            if node is None:
                 msg = f"Error mapping column ID {col_id} to field ID {column_field_id}: Field ID not found in field tree."
                 raise ValueError(msg)
+            node.setdefault("columns", []).append(
+                {
+                    "column_id": col_id,
+                    "type": column_type,
+                    "flags": column_flags,
+                    "rep_index": column_rep_index,
+                }
+            )
 
         # map alias columns to physical columns / projected fields in the field tree
         for alias_column in alias_column_descriptions:
             physical_column_id = alias_column.fPhysicalColumnID
             projected_field_id = alias_column.fFieldID
-            if projected_field_id in field_id_to_node:
-                node = field_id_to_node[projected_field_id]
-                if "alias_columns" not in node:
-                    node["alias_columns"] = []
-                node["alias_columns"].append({"physical_column_id": physical_column_id})
-            else:
+            node = field_id_to_node.get(projected_field_id)
+            if node is None:
                 msg = f"Error mapping alias column with physical column ID {physical_column_id} to projected field ID {projected_field_id}: Field ID not found in field tree."
                 raise ValueError(msg)
-
-        if filepath:
-            filepath_column = f"{filepath}_column_tree.txt"
-            with Path(filepath_column).open("w") as f:
-
-                def write_columns(node, indent=0):
-                    for fid, info in node.items():
-                        if (indent == 0) and (fid not in field_tree):
-                            continue  # skip non-top-level fields at top level (avoids duplicates)
-                        line = "  " * indent + f"- [{fid}] {info['name']}"
-                        if "columns" in info:
-                            line += " {Columns: "
-                            col_list = []
-                            for col in info["columns"]:
-                                col_str = f"[{col['column_id']}] Type: {col['type']}, RepIndex: {col['rep_index']}"
-                                if col["flags"]:
-                                    col_str += f" [{col['flags']}]"
-                                col_list.append(col_str)
-                            line += "; ".join(col_list) + "}"
-                        if "alias_columns" in info:
-                            line += " {AliasColumns: "
-                            alias_col_list = []
-                            for acol in info["alias_columns"]:
-                                acol_str = f"[Physical Column ID: {acol['physical_column_id']}]"
-                                alias_col_list.append(acol_str)
-                            line += "; ".join(alias_col_list) + "}"
-                        line += "\n"
-                        f.write(line)
-                        write_columns(info["children"], indent + 1)
-
-                write_columns(field_id_to_node)
-            print(f"Column mapping written to '{filepath_column}'")
-
-        if filepath:
-            # write field to column mapping to file
-            # this should be just like the field tree written in get_field_tree(), but with columns info added
-            filepath_field_column = f"{filepath}_field_column_tree.txt"
-
-            def write_field_column_tree(node, indent=0):
-                for fid, info in node.items():
-                    if (indent == 0) and (fid not in field_tree):
-                        continue  # skip non-top-level fields at top level (avoids duplicates)
-                    line = "  " * indent + f"- [{fid}] {info['name']}: {info['role']}"
-                    if info["flags"]:
-                        line += f" [{info['flags']}]"
-                    if info["type"]:
-                        line += f" ({info['type']})"
-                    if "columns" in info:
-                        line += " {Columns: "
-                        col_list = []
-                        for col in info["columns"]:
-                            col_str = f"[{col['column_id']}] Type: {col['type']}, RepIndex: {col['rep_index']}"
-                            if col["flags"]:
-                                col_str += f" [{col['flags']}]"
-                            col_list.append(col_str)
-                        line += "; ".join(col_list) + "}"
-                    if "alias_columns" in info:
-                        line += " {AliasColumns: "
-                        alias_col_list = []
-                        for acol in info["alias_columns"]:
-                            acol_str = (
-                                f"[Physical Column ID: {acol['physical_column_id']}]"
-                            )
-                            alias_col_list.append(acol_str)
-                        line += "; ".join(alias_col_list) + "}"
-                    if info["projections"]:
-                        line += " {Projections: "
-                        proj_list = []
-                        for pid, pinfo in info["projections"].items():
-                            proj_str = f"[{pid}] {pinfo['name']}"
-                            if pinfo["flags"]:
-                                proj_str += f" [{pinfo['flags']}]"
-                            if pinfo["type"]:
-                                proj_str += f" ({pinfo['type']})"
-                            proj_list.append(proj_str)
-                        line += "; ".join(proj_list) + "}"
-                    line += "\n"
-                    f.write(line)
-                    write_field_column_tree(info["children"], indent + 1)
-
-            with Path(filepath_field_column).open("w") as f:
-                write_field_column_tree(field_id_to_node)
-            print(f"Field to column tree written to '{filepath_field_column}'")
+            node.setdefault("alias_columns", []).append(
+                {"physical_column_id": physical_column_id}
+            )
 
         # if filepath:
         #     # write field to column mapping to file
@@ -349,9 +316,85 @@ def get_field_to_page_map(
         return field_id_to_node
 
     field_column_tree = map_columns_to_fields(
-        column_descriptions, alias_column_descriptions, field_tree, filepath=filepath
+        column_descriptions,
+        alias_column_descriptions,
+        field_id_to_node,
     )
 
+    def write_field_column_trees(field_tree: dict, filepath: str):
+        """
+        Writes the field tree, the column mapping and the field to column tree to text files.
+        The three files share most of each line, so they are filled from a single walk over the tree.
+        """
+        filepath_field = f"{filepath}_field_tree.txt"
+        filepath_column = f"{filepath}_column_tree.txt"
+        filepath_field_column = f"{filepath}_field_column_tree.txt"
+
+        field_parts: list[str] = []
+        column_parts: list[str] = []
+        field_column_parts: list[str] = []
+        for fid, info, indent in _iter_tree(field_tree):
+            name = f"{_INDENTS[indent]}- [{fid}] {info['name']}"
+            role = f": {info['role']}"
+            flags = f" [{info['flags']}]" if info["flags"] else ""
+            field_type = f" ({info['type']})" if info["type"] else ""
+            columns = ""
+            if "columns" in info:
+                col_list = []
+                for col in info["columns"]:
+                    col_str = f"[{col['column_id']}] Type: {col['type']}, RepIndex: {col['rep_index']}"
+                    if col["flags"]:
+                        col_str += f" [{col['flags']}]"
+                    col_list.append(col_str)
+                columns = f" {{Columns: {'; '.join(col_list)}}}"
+            alias_columns = ""
+            if "alias_columns" in info:
+                alias_col_list = [
+                    f"[Physical Column ID: {acol['physical_column_id']}]"
+                    for acol in info["alias_columns"]
+                ]
+                alias_columns = f" {{AliasColumns: {'; '.join(alias_col_list)}}}"
+            projections = ""
+            if info["projections"]:
+                proj_list = []
+                for pid, pinfo in info["projections"].items():
+                    proj_str = f"[{pid}] {pinfo['name']}"
+                    if pinfo["flags"]:
+                        proj_str += f" [{pinfo['flags']}]"
+                    if pinfo["type"]:
+                        proj_str += f" ({pinfo['type']})"
+                    proj_list.append(proj_str)
+                projections = f" {{Projections: {'; '.join(proj_list)}}}"
+
+            field_parts += (name, role, flags, field_type, projections, "\n")
+            column_parts += (name, columns, alias_columns, "\n")
+            field_column_parts += (
+                name,
+                role,
+                flags,
+                field_type,
+                columns,
+                alias_columns,
+                projections,
+                "\n",
+            )
+
+        with ExitStack() as stack:
+            f_field, f_column, f_field_column = (
+                stack.enter_context(Path(path).open("w"))
+                for path in (filepath_field, filepath_column, filepath_field_column)
+            )
+            f_field.write("".join(field_parts))
+            f_column.write("".join(column_parts))
+            # this is just like the field tree, but with columns info added
+            f_field_column.write("".join(field_column_parts))
+        print(f"Field tree written to '{filepath_field}'")
+        print(f"Column mapping written to '{filepath_column}'")
+        print(f"Field to column tree written to '{filepath_field_column}'")
+
+    if filepath:
+        write_field_column_trees(field_tree, filepath)
+
     # if extra_type_informations:
     #     # for now, just raise not implemented error so i know when we see one
     #     msg = f"ExtraTypeInformation handling not implemented yet (found {len(extra_type_informations)} entries):\n\t{extra_type_informations=}"
@@ -383,54 +426,62 @@ def get_field_to_page_map(
 
         # each column can span multiple clusters
         # for each column, get its pages for each cluster
-        # make sure not to overwrite pages if multiple clusters
-        # column_id_to_pages should take the column id as the first key, then cluster id as the second key
-        #   the value for each cluster id will be the cluster summary info and list of page descriptions
-        for cluster_id, cluster_summary in enumerate(cluster_summaries):
+        # column_id_to_pages takes the column id as the key; the value holds parallel lists
+        #   with one entry per cluster: the cluster id, the cluster summary info and the list of page descriptions
+        get_cluster_info = column_id_to_pages.get
+        for cluster_id, (cluster_summary, cluster_page_locations) in enumerate(
+            zip(cluster_summaries, page_locations, strict=True)
+        ):
             first_entry_number = cluster_summary.fFirstEntryNumber
             n_entries = cluster_summary.fNEntries
             feature_flag = cluster_summary.fFeatureFlag
 
-            for column_id, page_list in enumerate(page_locations[cluster_id]):
+            for column_id, page_list in enumerate(cluster_page_locations):
                 # page_list is the ListFrame of PageLocations for this column in this cluster
                 page_descriptions = page_list.items
 
-                if column_id not in column_id_to_pages:
-                    column_id_to_pages[column_id] = {}
+                cluster_info = get_cluster_info(column_id)
+                if cluster_info is None:
+                    cluster_info = column_id_to_pages[column_id] = {
+                        "cluster_id": [],
+                        "cluster_firstEntryNumber": [],
+                        "cluster_nEntries": [],
+                        "cluster_feature_flag": [],
+                        "pages": [],
+                    }
 
-                column_id_to_pages[column_id][cluster_id] = {
-                    "cluster_firstEntryNumber": first_entry_number,
-                    "cluster_nEntries": n_entries,
-                    "cluster_feature_flag": feature_flag,
-                    "pages": page_descriptions,
-                }
+                cluster_info["cluster_id"].append(cluster_id)
+                cluster_info["cluster_firstEntryNumber"].append(first_entry_number)
+                cluster_info["cluster_nEntries"].append(n_entries)
+                cluster_info["cluster_feature_flag"].append(feature_flag)
+                cluster_info["pages"].append(page_descriptions)
 
         # now, map pages to columns in the field-column tree
         for _fid, field_info in field_column_tree.items():
-            if "columns" in field_info:
-                for col in field_info["columns"]:
-                    col_id = col["column_id"]
-                    if col_id in column_id_to_pages:
-                        col["cluster_info"] = column_id_to_pages[col_id]
-                    else:
-                        msg = f"Error mapping pages to column ID {col_id}: Column ID not found in page locations."
-                        raise ValueError(msg)
+            for col in field_info.get("columns", ()):
+                col_id = col["column_id"]
+                cluster_info = get_cluster_info(col_id)
+                if cluster_info is None:
+                    msg = f"Error mapping pages to column ID {col_id}: Column ID not found in page locations."
+                    raise ValueError(msg)
+                col["cluster_info"] = cluster_info
 
         if filepath:
             # write field to column to page mapping to file
             filepath_field_column_page = f"{filepath}_field_column_page_tree.txt"
 
-            def write_field_column_page_tree(node, indent=0):
-                for fid, info in node.items():
-                    if (indent == 0) and (fid not in field_tree):
-                        continue  # skip non-top-level fields at top level (avoids duplicates)
-                    line = "  " * indent + f"- [{fid}] {info['name']}: {info['role']}"
+            def write_field_column_page_tree(node) -> str:
+                parts: list[str] = []
+                append = parts.append
+                for fid, info, indent in _iter_tree(node):
+                    append(_INDENTS[indent])
+                    append(f"- [{fid}] {info['name']}: {info['role']}")
                     if info["flags"]:
-                        line += f" [{info['flags']}]"
+                        append(f" [{info['flags']}]")
                     if info["type"]:
-                        line += f" ({info['type']})"
+                        append(f" ({info['type']})")
                     if "columns" in info:
-                        line += " {Columns: "
+                        append(" {Columns: ")
                         col_list = []
                         for col in info["columns"]:
                             col_str = f"[{col['column_id']}] Type: {col['type']}, RepIndex: {col['rep_index']}"
@@ -439,23 +490,39 @@ def get_field_to_page_map(
                             if "cluster_info" in col:
                                 col_str += ", Clusters: "
                                 cluster_list = []
-                                for cid, cinfo in col["cluster_info"].items():
-                                    cluster_str = f"[Cluster ID: {cid}] FirstEntry: {cinfo['cluster_firstEntryNumber']}, NEntries: {cinfo['cluster_nEntries']}, FeatureFlag: {cinfo['cluster_feature_flag']}, Pages: {cinfo['pages']}"
+                                cinfo = col["cluster_info"]
+                                for (
+                                    cid,
+                                    first_entry,
+                                    n_entries,
+                                    feature_flag,
+                                    pages,
+                                ) in zip(
+                                    cinfo["cluster_id"],
+                                    cinfo["cluster_firstEntryNumber"],
+                                    cinfo["cluster_nEntries"],
+                                    cinfo["cluster_feature_flag"],
+                                    cinfo["pages"],
+                                    strict=True,
+                                ):
+                                    cluster_str = f"[Cluster ID: {cid}] FirstEntry: {first_entry}, NEntries: {n_entries}, FeatureFlag: {feature_flag}, Pages: {pages}"
                                     cluster_list.append(cluster_str)
                                 col_str += "; ".join(cluster_list)
                             col_list.append(col_str)
-                        line += "; ".join(col_list) + "}"
+                        append("; ".join(col_list))
+                        append("}")
                     if "alias_columns" in info:
-                        line += " {AliasColumns: "
+                        append(" {AliasColumns: ")
                         alias_col_list = []
                         for acol in info["alias_columns"]:
                             acol_str = (
                                 f"[Physical Column ID: {acol['physical_column_id']}]"
                             )
                             alias_col_list.append(acol_str)
-                        line += "; ".join(alias_col_list) + "}"
+                        append("; ".join(alias_col_list))
+                        append("}")
                     if info["projections"]:
-                        line += " {Projections: "
+                        append(" {Projections: ")
                         proj_list = []
                         for pid, pinfo in info["projections"].items():
                             proj_str = f"[{pid}] {pinfo['name']}"
@@ -464,18 +531,18 @@ def get_field_to_page_map(
                             if pinfo["type"]:
                                 proj_str += f" ({pinfo['type']})"
                             proj_list.append(proj_str)
-                        line += "; ".join(proj_list) + "}"
-                    line += "\n"
-                    f.write(line)
-                    write_field_column_page_tree(info["children"], indent + 1)
+                        append("; ".join(proj_list))
+                        append("}")
+                    append("\n")
+                return "".join(parts)
 
             with Path(filepath_field_column_page).open("w") as f:
-                write_field_column_page_tree(field_column_tree)
+                f.write(write_field_column_page_tree(field_tree))
             print(
                 f"Field to column to page tree written to '{filepath_field_column_page}'"
             )
 
-            def write_field_column_page_tree_html(node, field_tree, filepath=""):
+            def write_field_column_page_tree_html(node, filepath=""):
                 """
                 Writes field to column to page mapping to an HTML file with accordion-style folds.
                 """
@@ -487,7 +554,7 @@ def get_field_to_page_map(
                     0
                 ]  # Make this the header text
 
-                html_content = f"""<!DOCTYPE html>
+                html_header = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -515,111 +582,117 @@ def get_field_to_page_map(
     <h1>{filepath_trimmed} Field Column Page Tree</h1>
     <div id="tree"></div>
     <script>
+        document.getElementById('tree').innerHTML = `
 """
 
-                def build_html_tree(node, indent=0):
-                    html_lines = []
-                    for fid, info in node.items():
-                        if (indent == 0) and (fid not in field_tree):
-                            continue
-
-                        # Create accordion button
-                        button_id = f"btn_{fid}_{id(info)}"
-                        panel_id = f"panel_{fid}_{id(info)}"
+                def build_html_tree(node, write):
+                    # each node's panel stays open until its subtree has been written
+                    open_panels = 0
+                    for fid, info, indent in _iter_tree(node):
+                        # close the panels of the nodes whose subtrees just ended
+                        write("</div>\n" * (open_panels - indent))
+                        open_panels = indent + 1
 
                         # Build summary text
-                        summary = f"[{fid}] {info['name']}: {info['role']}"
+                        summary_parts = [f"[{fid}] {info['name']}: {info['role']}"]
                         if info["flags"]:
-                            summary += f" [{info['flags']}]"
+                            summary_parts.append(f" [{info['flags']}]")
                         if info["type"]:
-                            summary += f" ({info['type']})"
-
-                        html_lines.append(
-                            f'<button class="accordion indent-{indent}" id="{button_id}">{summary}</button>'
-                        )
-                        html_lines.append(
-                            f'<div class="panel indent-{indent}" id="{panel_id}">'
+                            summary_parts.append(f" ({info['type']})")
+                        summary = "".join(summary_parts)
+
+                        # Create accordion button and open its panel
+                        # (field IDs are unique across the tree, so they make stable element IDs)
+                        write(
+                            f'<button class="accordion indent-{indent}" id="btn_{fid}">{summary}</button>\n'
+                            f'<div class="panel indent-{indent}" id="panel_{fid}">\n'
                         )
 
                         # Add column info
                         if "columns" in info:
-                            html_lines.append('<div class="column-info">')
+                            write('<div class="column-info">\n')
                             for col in info["columns"]:
                                 col_str = f"[{col['column_id']}] Type: {col['type']}, RepIndex: {col['rep_index']}"
                                 if col["flags"]:
                                     col_str += f" [{col['flags']}]"
-                                html_lines.append(f"<div>Column: {col_str}</div>")
+                                write(f"<div>Column: {col_str}</div>\n")
 
                                 if "cluster_info" in col:
-                                    for cid, cinfo in col["cluster_info"].items():
-                                        cluster_str = f"Cluster ID: {cid}, FirstEntry: {cinfo['cluster_firstEntryNumber']}, NEntries: {cinfo['cluster_nEntries']}, FeatureFlag: {cinfo['cluster_feature_flag']}, Pages: {len(cinfo['pages'])}"
-                                        html_lines.append(
-                                            f"<div style='margin-left: 20px; color: #006666;'>{cluster_str}</div>"
+                                    cinfo = col["cluster_info"]
+                                    for (
+                                        cid,
+                                        first_entry,
+                                        n_entries,
+                                        feature_flag,
+                                        pages,
+                                    ) in zip(
+                                        cinfo["cluster_id"],
+                                        cinfo["cluster_firstEntryNumber"],
+                                        cinfo["cluster_nEntries"],
+                                        cinfo["cluster_feature_flag"],
+                                        cinfo["pages"],
+                                        strict=True,
+                                    ):
+                                        cluster_str = f"Cluster ID: {cid}, FirstEntry: {first_entry}, NEntries: {n_entries}, FeatureFlag: {feature_flag}, Pages: {len(pages)}"
+                                        write(
+                                            f"<div style='margin-left: 20px; color: #006666;'>{cluster_str}</div>\n"
                                         )
-                                        for page in cinfo["pages"]:
-                                            html_lines.append(
-                                                f"<div style='margin-left: 40px; font-size: 11px;'>{page}</div>"
+                                        # one write per cluster rather than per page
+                                        write(
+                                            "".join(
+                                                f"<div style='margin-left: 40px; font-size: 11px;'>{page}</div>\n"
+                                                for page in pages
                                             )
-                            html_lines.append("</div>")
+                                        )
+                            write("</div>\n")
 
                         # Add alias columns
                         if "alias_columns" in info:
-                            html_lines.append('<div style="color: #0099cc;">')
+                            write('<div style="color: #0099cc;">\n')
                             for acol in info["alias_columns"]:
-                                html_lines.append(
-                                    f"<div>Alias Column - Physical Column ID: {acol['physical_column_id']}</div>"
+                                write(
+                                    f"<div>Alias Column - Physical Column ID: {acol['physical_column_id']}</div>\n"
                                 )
-                            html_lines.append("</div>")
+                            write("</div>\n")
 
                         # Add projections
                         if info["projections"]:
-                            html_lines.append('<div style="color: #ff6600;">')
+                            write('<div style="color: #ff6600;">\n')
                             for pid, pinfo in info["projections"].items():
                                 proj_str = f"[{pid}] {pinfo['name']}"
                                 if pinfo["flags"]:
                                     proj_str += f" [{pinfo['flags']}]"
                                 if pinfo["type"]:
                                     proj_str += f" ({pinfo['type']})"
-                                html_lines.append(f"<div>Projection: {proj_str}</div>")
-                            html_lines.append("</div>")
-
-                        # Recurse to children
-                        if info["children"]:
-                            html_lines.extend(
-                                build_html_tree(info["children"], indent + 1)
-                            )
-
-                        html_lines.append("</div>")
+                                write(f"<div>Projection: {proj_str}</div>\n")
+                            write("</div>\n")
 
-                    return html_lines
+                    write("</div>\n" * open_panels)
 
-                html_tree = build_html_tree(node)
-                html_tree_str = "\n        ".join(html_tree)
-
-                html_content += f"""        document.getElementById('tree').innerHTML = `
-        {html_tree_str}
-        `;
+                html_footer = """        `;
 
         const accordions = document.querySelectorAll('.accordion');
-        accordions.forEach(button => {{
-            button.addEventListener('click', function() {{
+        accordions.forEach(button => {
+            button.addEventListener('click', function() {
                 this.classList.toggle('active');
                 const panel = this.nextElementSibling;
                 panel.classList.toggle('active');
-            }});
-        }});
+            });
+        });
     </script>
 </body>
 </html>
 """
 
-                with Path(filepath_html).open("w") as f:
-                    f.write(html_content)
+                # stream the tree straight into the file between the header and footer,
+                # through a large buffer so the many small writes reach the OS in big chunks
+                with Path(filepath_html).open("w", buffering=1 << 20) as f:
+                    f.write(html_header)
+                    build_html_tree(node, f.write)
+                    f.write(html_footer)
                 print(f"Field to column to page tree written to '{filepath_html}'")
 
-            write_field_column_page_tree_html(
-                field_column_tree, field_tree, filepath=filepath
-            )
+            write_field_column_page_tree_html(field_tree, filepath=filepath)
 
         return field_column_tree
 
@@ -633,121 +706,222 @@ def get_field_to_page_map(
     # return field_column_page_tree
 
 
-def print_members_recursive(obj):
+# ANSI color codes for pretty printing
+COLOR_CLASS = "\033[1;34m"  # Bold blue
+COLOR_FIELD = "\033[1;32m"  # Bold green
+COLOR_TOP = "\033[1;35m"  # Bold magenta/pink
+COLOR_RESET = "\033[0m"
+COLOR_LIST = "\033[1;36m"  # Bold cyan
+
+
+class _FieldInfo(NamedTuple):
+    """What the member printer needs to know about one dataclass type"""
+
+    names: tuple[str, ...]
+    "Field names, in declaration order"
+    unknown_index: int
+    'Index of the "_unknown" field, or -1 if the class has none'
+    oneline_labels: tuple[str, ...]
+    'Colored one-line label ("name=") of each field'
+    expanded_labels: tuple[str, ...]
+    'Colored expanded label ("  name = ") of each field'
+    get_values: Callable[[object], tuple]
+    "Returns all field values of an instance, in order"
+
+
+# filled on first sight of each class, so the printer reads __dataclass_fields__ and builds the labels once per type
+_FIELD_INFO_CACHE: dict[type, _FieldInfo] = {}
+
+
+def _get_field_info(cls: type) -> _FieldInfo:
+    info = _FIELD_INFO_CACHE.get(cls)
+    if info is None:
+        names = tuple(cls.__dataclass_fields__)  # type: ignore[attr-defined]
+        # one attrgetter call loads every field in C; it returns a bare value for a single name
+        get_values: Callable[[object], tuple]
+        if len(names) > 1:
+            get_values = attrgetter(*names)
+        elif names:
+            get_value = attrgetter(names[0])
+            get_values = lambda o: (get_value(o),)
+        else:
+            get_values = lambda _o: ()
+        info = _FIELD_INFO_CACHE[cls] = _FieldInfo(
+            names=names,
+            unknown_index=names.index("_unknown") if "_unknown" in names else -1,
+            oneline_labels=tuple(f"{COLOR_FIELD}{f}{COLOR_RESET}=" for f in names),
+            expanded_labels=tuple(f"  {COLOR_FIELD}{f}{COLOR_RESET} = " for f in names),
+            get_values=get_values,
+        )
+    return info
+
+
+def print_members_recursive(obj, binary=False):
     """
     Recursively print the members of a class instance, with color coding.
     Works for all classes that use the @serializable decorator.
+
+    Args:
+        obj: The object to print.
+        binary (bool): Encode the whole dump once and write it to the binary buffer under stdout,
+            bypassing the text layer. Falls back to a text write when stdout has no buffer.
     """
 
-    # ANSI color codes for pretty printing
-    COLOR_CLASS = "\033[1;34m"  # Bold blue
-    COLOR_FIELD = "\033[1;32m"  # Bold green
-    COLOR_TOP = "\033[1;35m"  # Bold magenta/pink
-    COLOR_RESET = "\033[0m"
-    COLOR_LIST = "\033[1;36m"  # Bold cyan
-
-    def _oneline_repr(o):
-        """Return a one-line color-coded repr of the class and its fields, recursively."""
-        items = []
-        for f in getattr(o, "__dataclass_fields__", {}):
-            v = getattr(o, f)
-            if f == "_unknown" and not v:
+    def _oneline_repr_into(o, parts):
+        """Append a one-line color-coded repr of the class and its fields to parts, recursively."""
+        parts.append(f"{COLOR_CLASS}{o.__class__.__name__}(")
+        info = _get_field_info(type(o))
+        unknown_index = info.unknown_index
+        separator = ""
+        for i, v in enumerate(info.get_values(o)):
+            if i == unknown_index and not v:
                 continue
+            parts.append(separator)
+            parts.append(info.oneline_labels[i])
             # If the field is a dataclass, recurse one level for compactness
             if hasattr(v, "__dataclass_fields__"):
-                items.append(f"{COLOR_FIELD}{f}{COLOR_RESET}={_oneline_repr(v)}")
+                _oneline_repr_into(v, parts)
             else:
-                items.append(f"{COLOR_FIELD}{f}{COLOR_RESET}={v!r}")
-        return f"{COLOR_CLASS}{o.__class__.__name__}({', '.join(items)}{COLOR_CLASS}){COLOR_RESET}"
-
-    def _is_compact(o):
-        """Decide if all fields can be printed on one line (no lists/tuples, <=5 fields)."""
-        fields = getattr(o, "__dataclass_fields__", {})
-        if len(fields) > 5:
-            return False
-        for f in fields:
-            v = getattr(o, f)
-            if isinstance(v, (list, tuple)):
-                return False
-        return True
-
-    def _recurse(obj, indent, visited, mode, lines):
-        prefix = " " * indent
-        # Avoid infinite recursion on cyclic references
-        obj_id = id(obj)
-        if obj_id in visited:
-            lines.append(f"{prefix}<recursion detected>")
-            return
-        visited.add(obj_id)
-
-        # If dataclass, print fields
-        if hasattr(obj, "__dataclass_fields__"):
-            fields = list(obj.__dataclass_fields__)
-            # Print class name if not suppressed
-            if mode != "suppress_classname":
-                if _is_compact(obj):
-                    # Print all fields on one line
-                    onelinerepr = _oneline_repr(obj)
-                    if not lines or len(lines) == 1:
-                        lines.append(onelinerepr)
-                    else:
-                        lines[-1] += onelinerepr
-                    return
-                if mode == "in_list":
-                    lines[-1] += f"{COLOR_CLASS}{obj.__class__.__name__}:{COLOR_RESET}"
-                else:
-                    lines.append(
-                        f"{prefix}{COLOR_CLASS}{obj.__class__.__name__}:{COLOR_RESET}"
-                    )
+                parts.append(repr(v))
+            separator = ", "
+        parts.append(f"{COLOR_CLASS}){COLOR_RESET}")
+
+    def _render(root, parts):
+        """Append the members of root to parts, walking an explicit stack instead of recursing."""
+        # Avoid infinite recursion on cyclic references: ids of the objects being expanded
+        # on the current path, so objects shared between branches still print in full
+        visited = set()
+        # the stack holds string fragments still to emit, (obj, indent, mode) items still to
+        # expand, and int ids to drop from visited once everything above them is done
+        stack = [(root, 0, "")]
+        while stack:
+            item = stack.pop()
+            if type(item) is str:
+                parts.append(item)
+                continue
+            if type(item) is int:
+                visited.discard(item)
+                continue
+            obj, indent, mode = item
+            prefix = " " * indent
+            obj_id = id(obj)
+            if obj_id in visited:
+                parts.append(f"\n{prefix}<recursion detected>")
+                continue
 
-            # Print each field, recursively if needed
-            for f in fields:
-                v = getattr(obj, f)
-                if f == "_unknown" and not v:
-                    continue
-                lines.append(f"{prefix}  {COLOR_FIELD}{f}{COLOR_RESET} = ")
-                # If the field is a dataclass, recurse
-                if hasattr(v, "__dataclass_fields__"):
-                    _recurse(v, indent + 4, visited, "", lines)
-                # If the field is a list or tuple, print each item
-                elif isinstance(v, (list, tuple)):
-                    if v:
-                        lines[-1] += (
-                            f"{COLOR_LIST}[{len(v)} item list of {COLOR_CLASS}{v[0].__class__.__name__}{COLOR_LIST}]:{COLOR_RESET}"
+            # If dataclass, print fields
+            if hasattr(obj, "__dataclass_fields__"):
+                info = _get_field_info(type(obj))
+                unknown_index = info.unknown_index
+                # Read every field once, noting nested dataclasses and lists/tuples on the way
+                entries = []
+                has_seq = False
+                for i, v in enumerate(info.get_values(obj)):
+                    is_seq = isinstance(v, (list, tuple))
+                    if is_seq:
+                        has_seq = True
+                    if i == unknown_index and not v:
+                        continue
+                    entries.append((i, v, hasattr(v, "__dataclass_fields__"), is_seq))
+
+                # Print class name if not suppressed
+                if mode != "suppress_classname":
+                    # Print all fields on one line (no lists/tuples, <=5 fields)
+                    if len(info.names) <= 5 and not has_seq:
+                        # start a new line only right after the header
+                        if len(parts) == 1:
+                            parts.append("\n")
+                        parts.append(f"{COLOR_CLASS}{obj.__class__.__name__}(")
+                        separator = ""
+                        for i, v, is_dc, _ in entries:
+                            parts.append(separator)
+                            parts.append(info.oneline_labels[i])
+                            if is_dc:
+                                _oneline_repr_into(v, parts)
+                            else:
+                                parts.append(repr(v))
+                            separator = ", "
+                        parts.append(f"{COLOR_CLASS}){COLOR_RESET}")
+                        continue
+                    if mode == "in_list":
+                        parts.append(
+                            f"{COLOR_CLASS}{obj.__class__.__name__}:{COLOR_RESET}"
+                        )
+                    else:
+                        parts.append(
+                            f"\n{prefix}{COLOR_CLASS}{obj.__class__.__name__}:{COLOR_RESET}"
                         )
-                        for idx, item in enumerate(v):
-                            lines.append(
-                                f"{prefix}    [{COLOR_LIST}{idx}{COLOR_RESET}] "
+
+                # Emit fields straight into parts up to the first one that needs expanding,
+                # then queue the rest so nested objects come out before the fragments after them
+                visited.add(obj_id)
+                stack.append(obj_id)
+                todo = []
+                out = parts
+                line_start = f"\n{prefix}"
+                expanded_labels = info.expanded_labels
+                for i, v, is_dc, is_seq in entries:
+                    out.append(line_start)
+                    label = expanded_labels[i]
+                    # If the field is a dataclass, expand it
+                    if is_dc:
+                        out.append(label)
+                        todo.append((v, indent + 4, ""))
+                        out = todo
+                    # If the field is a list or tuple, expand each item
+                    elif is_seq:
+                        if v:
+                            out.append(
+                                f"{label}{COLOR_LIST}[{len(v)} item list of {COLOR_CLASS}{v[0].__class__.__name__}{COLOR_LIST}]:{COLOR_RESET}"
                             )
-                            _recurse(item, indent + 8, visited, "in_list", lines)
+                            for idx, list_item in enumerate(v):
+                                todo.append(
+                                    f"\n{prefix}    [{COLOR_LIST}{idx}{COLOR_RESET}] "
+                                )
+                                todo.append((list_item, indent + 8, "in_list"))
+                            out = todo
+                        else:
+                            out.append(f"{label}{COLOR_LIST}[empty list]{COLOR_RESET}")
                     else:
-                        lines[-1] += f"{COLOR_LIST}[empty list]{COLOR_RESET}"
-                else:
-                    # Print primitive field value
-                    lines[-1] += repr(v)
-        elif isinstance(obj, (list, tuple)):
-            # If it's a list or tuple, print each item
-            lines.append(f"{prefix}{COLOR_LIST}[{len(obj)} item list]:{COLOR_RESET}")
-            for idx, item in enumerate(obj):
-                lines.append(f"{prefix}  [{COLOR_LIST}{idx}{COLOR_RESET}] ")
-                _recurse(item, indent + 4, visited, "in_list", lines)
-        else:
-            # Not a dataclass, just print the value
-            lines.append(f"{prefix}{obj!r}")
+                        # Print primitive field value
+                        out.append(label)
+                        out.append(repr(v))
+                stack.extend(reversed(todo))
+            elif isinstance(obj, (list, tuple)):
+                # If it's a list or tuple, print each item
+                parts.append(
+                    f"\n{prefix}{COLOR_LIST}[{len(obj)} item list]:{COLOR_RESET}"
+                )
+                visited.add(obj_id)
+                stack.append(obj_id)
+                todo = []
+                for idx, list_item in enumerate(obj):
+                    todo.append(f"\n{prefix}  [{COLOR_LIST}{idx}{COLOR_RESET}] ")
+                    todo.append((list_item, indent + 4, "in_list"))
+                stack.extend(reversed(todo))
+            else:
+                # Not a dataclass, just print the value
+                parts.append(f"\n{prefix}{obj!r}")
 
-    lines = []
     # Print class header
-    lines.append(
+    parts = [
         f"{COLOR_TOP}{'-' * 27} Printing {obj.__class__.__name__}: {'-' * 27}{COLOR_RESET}"
-    )
-    # Print the members recursively
-    _recurse(obj, 0, set(), "", lines)
+    ]
+    # Print the members
+    _render(obj, parts)
     # Print class footer
-    lines.append(
-        f"{COLOR_TOP}{'-' * 25} Done Printing {obj.__class__.__name__}! {'-' * 24}\n{COLOR_RESET}"
+    parts.append(
+        f"\n{COLOR_TOP}{'-' * 25} Done Printing {obj.__class__.__name__}! {'-' * 24}\n{COLOR_RESET}\n"
     )
-    # Join all lines and print
-    print("\n".join(lines))
+    # Join all fragments once and write them in a single call
+    text = "".join(parts)
+    buffer = getattr(sys.stdout, "buffer", None) if binary else None
+    if buffer is None:
+        sys.stdout.write(text)
+    else:
+        # flush the text layer first so earlier output stays in order
+        sys.stdout.flush()
+        buffer.write(text.encode(sys.stdout.encoding, sys.stdout.errors or "strict"))
 
 
 if __name__ == "__main__":
@@ -764,6 +938,10 @@ if __name__ == "__main__":
     path = Path(f"{filename}.rntpl")
     print(f"\033[1;36mReading '{path}'...\n\033[0m")
     with path.open("rb") as filehandle:
+        # map the file once; every fetch is then a zero-copy slice paged in by the OS
+        # instead of a seek + read syscall pair per envelope and key
+        mapping = mmap.mmap(filehandle.fileno(), 0, access=mmap.ACCESS_READ)
+        data = memoryview(mapping)
 
         def fetch_data(seek: int, size: int):
             """Fetches data from a file at a specified position and size.
@@ -776,10 +954,8 @@ if __name__ == "__main__":
                 ReadBuffer: A buffer containing the read data, along with the seek position and an offset of 0.
             """
             # print(f"\033[3;33mfetch_data {seek=} {size=}\033[0m")
-            filehandle.seek(seek)
-            # return ReadBuffer(memoryview(filehandle.read(size)), seek, 0)
             return ReadBuffer(
-                memoryview(filehandle.read(size)),
+                data[seek : seek + size],
                 0,
                 BOOTSTRAP_CONTEXT,
                 BufferContext(abspos=seek),
@@ -790,15 +966,9 @@ if __name__ == "__main__":
         file, _ = ROOTFile.read(buffer)
         print(f"\t{file}\n")
 
-        def fetch_cached(seek: int, size: int):
-            # print(f"\033[3;33mfetch_cached {seek=} {size=}\033[0m")
-            if seek + size <= len(buffer):
-                return buffer[seek : seek + size]
-            print("Didn't find data in initial read buffer, fetching from file")
-            return fetch_data(seek, size)
-
-        # Get TFile object (root TDirectory)
-        tfile = file.get_TFile(fetch_cached)
+        # Get TFile object (root TDirectory); fetches are slices of the mapping, so there
+        # is no separate cache of already-read ranges to check first
+        tfile = file.get_TFile(fetch_data)
         print(f"\t{tfile}\n")
 
         # usually the directory tkeylist and the streamer info are adjacent at the end of the file
@@ -814,10 +984,11 @@ if __name__ == "__main__":
         keylist = tfile.get_KeyList(fetch_data)
 
         # Print TKeyList
-        msg = "\tTKey List Summary:\n"
+        summary = ["\tTKey List Summary:\n"]
         for name, key in keylist.items():
-            msg += f"\t\tName: {name}; Class: {key.fClassName.fString}\n"
-        print(msg)
+            summary.append(f"\t\tName: {name}; Class: {key.fClassName.fString}\n")
+        summary.append("\n")
+        sys.stdout.writelines(summary)
 
         # # Get TStreamerInfo (List of classes used in the file)
         # streamerinfo = file.get_StreamerInfo(fetch_data)
@@ -843,6 +1014,14 @@ if __name__ == "__main__":
                 ### Get RNTuple Anchor Object
                 anchor = tkey.read_object(fetch_data, ROOT3a3aRNTuple)
                 print_members_recursive(anchor)
+                # start paging in both envelopes before they are parsed
+                advise_ranges(
+                    mapping,
+                    [
+                        (anchor.fSeekHeader, anchor.fNBytesHeader),
+                        (anchor.fSeekFooter, anchor.fNBytesFooter),
+                    ],
+                )
 
                 ### Construct RNTuple from Anchor
                 rntuple = RNTuple.from_anchor(anchor, fetch_data)
@@ -858,15 +1037,22 @@ if __name__ == "__main__":
 
                 # Iterate through fieldDescriptions, printing only the top-level fields
                 print("\nRNTuple Top-Level Fields:")
-                nFields = len(schemaDescription.fieldDescriptions)
-                topLevelFields_names = []
-                for fieldID, fieldDescription in enumerate(
-                    schemaDescription.fieldDescriptions
-                ):
-                    if fieldDescription.fParentFieldID == fieldID:
-                        topLevelFields_names.append(fieldDescription.fFieldName.fString)
-
-                        # print_members_recursive(fieldDescription)
+                fieldDescriptions = schemaDescription.fieldDescriptions
+                nFields = len(fieldDescriptions)
+                # top-level fields are their own parents; compare all IDs at once
+                parent_ids = np.fromiter(
+                    (
+                        fieldDescription.fParentFieldID
+                        for fieldDescription in fieldDescriptions
+                    ),
+                    dtype=np.int64,
+                    count=nFields,
+                )
+                top_level_ids = np.flatnonzero(parent_ids == np.arange(nFields))
+                topLevelFields_names = [
+                    fieldDescriptions[fieldID].fFieldName.fString
+                    for fieldID in top_level_ids.tolist()
+                ]
                 # print(f"\tTop-Level Field Names: {topLevelFields_names}")
                 print(
                     f"\tTotal Top-Level Fields: {len(topLevelFields_names)} / {nFields}"
@@ -896,86 +1082,101 @@ if __name__ == "__main__":
                 #                     print(f"Found page at offset 76688: {page}")
                 #                     print(f"\tWith pageList: {pagelist=} \n")
 
-                extended_page_descriptions = rntuple.get_extended_page_descriptions()
-                # print_members_recursive(extended_page_descriptions)
-                # page_counter = 0
-                # size_total = 0
-                # Collect page size and offset for CSV
-                # # Write CSV file with page size, offset, fNElements, columnType
-                # with open(f"{filename}.csv", "w", newline="") as csvfile:
-                #     csvfile.write("#size,offset,fNElements,columnType\n")
-                #     for i, pagelistenvelope in enumerate(rntuple.pagelistEnvelopes):
-                #         csvfile.write(f"#Cluster Group (Page List Envelope) {i}\n")
-                #         for i_cluster, columnlist in enumerate(pagelistenvelope.pageLocations):
-                #             csvfile.write(f"\t#Cluster {i_cluster}\n")
-                #             for i_column, pagelist in enumerate(columnlist):
-                #                 csvfile.write(f"\t\t#Column {i_column}, elementoffset={pagelist.elementoffset}, compressionsettings={pagelist.compressionsettings}\n")
-                #                 for i_page, page in enumerate(pagelist):
-                #                     page_counter += 1
-                #                     size_total += page.locator.size
-
-                #                     # # print(f"Page {page_counter}: Cluster {i_cluster}, Column {i_column}, Page {i_page}: {page}")
-                #                     # # print(f"\t{page=}")
-                #                     csvfile.write(f"\t\t\t{page.locator.size},{page.locator.offset},{page.fNElements}\n")
-                #                     # # Save size and offset for CSV
-                #                     # page_info.append((
-                #                     #     page.pageDescription.locator.size,
-                #                     #     page.pageDescription.locator.offset,
-                #                     #     page.pageDescription.fNElements,
-                #                     #     repr(page.columnType)
-                #                     # ))
-                #                     # quit()
-                #                     # if page.pageDescription.locator.offset == 76688:
-                #                     #     print(f"Found page at offset 76688: {page}")
-
-                # page_info = []
-                # with open(f"{filename}.csv", "w", newline="") as csvfile:
-                #     # csvfile.write("#size,offset,fNElements,columnType\n")
-                #     for i, pagelistenvelope in enumerate(extended_page_descriptions):
-                #         # csvfile.write(f"#Cluster Group (Page List Envelope) {i}\n")
-                #         for i_cluster, columnlist in enumerate(pagelistenvelope):
-                #             # csvfile.write(f"\t#Cluster {i_cluster}\n")
-                #             for i_column, pagelist in enumerate(columnlist):
-                #                 # csvfile.write(f"\t\t#Column {i_column}\n")
-                #                 for i_page, page in enumerate(pagelist):
-                #                     page_counter += 1
-                #                     size_total += page.pageDescription.locator.size
-                #                     # print(f"Page {page_counter}: Cluster {i_cluster}, Column {i_column}, Page {i_page}: {page}")
-                #                     # print(f"\t{page=}")
-                #                     # csvfile.write(f"\t\t\t{page.pageDescription.locator.size},{page.pageDescription.locator.offset},{page.pageDescription.fNElements},{repr(page.columnType)}\n")
-                #                     # Save size and offset for CSV
-                #                     page_info.append((
-                #                         page.pageDescription.locator.size,
-                #                         page.pageDescription.locator.offset,
-                #                         page.pageDescription.fNElements,
-                #                         repr(page.columnType)
-                #                     ))
-                #                     # quit()
-                #                     # if page.pageDescription.locator.offset == 76688:
-                #                     #     print(f"Found page at offset 76688: {page}")
-
-                # print(f"Total Pages: {page_counter}")
-                # print(f"Total Compressed Size: {size_total / (1024 * 1024):.2f} MB")
-                # print(f"Average Compressed Size per Page: {size_total / page_counter / 1024:.2f} KB")
-
-                # # Write CSV file with page size, offset, fNElements, columnType
-                # with open(f"{filename}_all.csv", "w", newline="") as csvfile:
-                #     csvfile.write("#size,offset,fNElements,columnType\n")
-                #     for size, offset, fNElements, columnType in page_info:
-                #         csvfile.write(f"{size},{offset},{fNElements},{columnType}\n")
-
-                # # Write CSV file of unique pages (unique offset and size)
-                # with open(f"{filename}_unique.csv", "w", newline="") as csvfile:
-                #     csvfile.write("#size,offset,fNElements,columnType\n")
-                #     unique_pages = set()
-                #     for size, offset, fNElements, columnType in page_info:
-                #         if (size, offset) not in unique_pages:
-                #             unique_pages.add((size, offset))
-                #             csvfile.write(f"{size},{offset},{fNElements},{columnType}\n")
-
-                # print(f"\nTotal Unique Pages: {len(unique_pages)}")
-                # print(f"Total Unique Compressed Size: {sum(size for size, offset in unique_pages) / (1024 * 1024):.2f} MB")
-                # print(f"Average Unique Compressed Size per Page: {sum(size for size, offset in unique_pages) / len(unique_pages) / 1024:.2f} KB")
+                # Collect the page descriptions straight from the page lists, skipping suppressed
+                # columns like get_extended_page_descriptions does, but without building an
+                # InterpretablePage (and re-deriving the schema description) per column
+                column_types = [
+                    repr(column_description.fColumnType)
+                    for column_description in schemaDescription.columnDescriptions
+                ]
+                page_descriptions = []
+                page_column_types = []
+                for pagelistenvelope in rntuple.pagelistEnvelopes:
+                    for columnlist in pagelistenvelope.pageLocations:
+                        for pagelist, column_type in zip(
+                            columnlist, column_types, strict=False
+                        ):
+                            if pagelist.elementoffset < 0:
+                                continue
+                            page_descriptions.extend(pagelist)
+                            page_column_types.extend([column_type] * len(pagelist))
+
+                # page size, offset and fNElements as int64 columns
+                page_counter = len(page_descriptions)
+                sizes = np.fromiter(
+                    (page.locator.size for page in page_descriptions),
+                    dtype=np.int64,
+                    count=page_counter,
+                )
+                # pages stored in a file always have a StandardLocator
+                offsets = np.fromiter(
+                    (page.locator.offset for page in page_descriptions),  # type: ignore[attr-defined]
+                    dtype=np.int64,
+                    count=page_counter,
+                )
+                nelements = np.fromiter(
+                    (page.fNElements for page in page_descriptions),
+                    dtype=np.int64,
+                    count=page_counter,
+                )
+
+                size_total = int(sizes.sum())
+                print(f"Total Pages: {page_counter}")
+                print(f"Total Compressed Size: {size_total / (1024 * 1024):.2f} MB")
+                if page_counter:
+                    print(
+                        f"Average Compressed Size per Page: {size_total / page_counter / 1024:.2f} KB"
+                    )
+
+                # Write CSV file with page size, offset, fNElements, columnType
+                with Path(f"{filename}_{name}_all.csv").open(
+                    "w", newline="", buffering=1 << 20
+                ) as csvfile:
+                    writer = csv.writer(csvfile, lineterminator="\n")
+                    writer.writerow(("#size", "offset", "fNElements", "columnType"))
+                    writer.writerows(
+                        zip(
+                            sizes.tolist(),
+                            offsets.tolist(),
+                            nelements.tolist(),
+                            page_column_types,
+                            strict=True,
+                        )
+                    )
+
+                # Find unique pages (unique offset and size), keeping the first occurrence of each;
+                # lexsort is stable, so the first of each run of equal (offset, size) is the first occurrence
+                order = np.lexsort((sizes, offsets))
+                first = np.ones(page_counter, dtype=bool)
+                first[1:] = (np.diff(offsets[order]) != 0) | (
+                    np.diff(sizes[order]) != 0
+                )
+                first_index = np.sort(order[first])
+                unique_size_total = int(sizes[first_index].sum())
+                print(f"\nTotal Unique Pages: {len(first_index)}")
+                print(
+                    f"Total Unique Compressed Size: {unique_size_total / (1024 * 1024):.2f} MB"
+                )
+                if len(first_index):
+                    print(
+                        f"Average Unique Compressed Size per Page: {unique_size_total / len(first_index) / 1024:.2f} KB"
+                    )
+
+                # Write CSV file of unique pages
+                with Path(f"{filename}_{name}_unique.csv").open(
+                    "w", newline="", buffering=1 << 20
+                ) as csvfile:
+                    writer = csv.writer(csvfile, lineterminator="\n")
+                    writer.writerow(("#size", "offset", "fNElements", "columnType"))
+                    writer.writerows(
+                        zip(
+                            sizes[first_index].tolist(),
+                            offsets[first_index].tolist(),
+                            nelements[first_index].tolist(),
+                            [page_column_types[i] for i in first_index.tolist()],
+                            strict=True,
+                        )
+                    )
 
                 # pages = [pagelistenvelope.get_pages(fetch_data) for pagelistenvelope in rntuple.pagelistEnvelopes]
 
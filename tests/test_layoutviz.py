@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import io
+import json
+from types import SimpleNamespace
+
+from rhydrator.layoutviz import Config, PageData, ProfileBulder, cluster_pages
+
+
+def render(profile: ProfileBulder, endValue: int) -> dict:
+    out = io.StringIO()
+    profile.render(out, endValue=endValue)
+    return json.loads(out.getvalue())
+
+
+def frame_events(doc: dict) -> list[tuple[str, str, int]]:
+    frames = doc["shared"]["frames"]
+    return [
+        (event["type"], frames[event["frame"]]["name"], event["at"])
+        for event in doc["profiles"][0]["events"]
+    ]
+
+
+def test_render_document():
+    profile = ProfileBulder(config=Config())
+    profile.push_frame({"name": "file", "file": None, "line": None, "col": None})
+    profile.add_span("Header", offset=0, size=10)
+    profile.push_shared_frame("Cluster")
+    profile.add_span("Page", offset=20, size=5)
+    profile.add_span("Page", offset=10, size=10)
+    profile.pop_frame()
+    profile.pop_frame()
+
+    doc = render(profile, endValue=30)
+    assert doc["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+    assert doc["exporter"] == "rhydrator.layoutviz"
+    (speedscope,) = doc["profiles"]
+    assert speedscope["type"] == "evented"
+    assert speedscope["endValue"] == 30
+    assert frame_events(doc) == [
+        ("O", "file", 0),
+        ("O", "Header", 0),
+        ("C", "Header", 10),
+        ("O", "Cluster", 10),
+        ("O", "Page", 10),
+        ("C", "Page", 20),
+        ("O", "Page", 20),
+        ("C", "Page", 25),
+        ("C", "Cluster", 25),
+        ("C", "file", 25),
+    ]
+
+
+def test_render_closes_frames_below_shorter_span():
+    profile = ProfileBulder(config=Config())
+    profile.push_frame({"name": "file", "file": None, "line": None, "col": None})
+    profile.push_shared_frame("A")
+    profile.push_shared_frame("B")
+    profile.add_span("Page", offset=0, size=10)
+    profile.pop_frame()
+    profile.pop_frame()
+    # the next span's stack is a strict prefix of the previous one
+    profile.add_span("A", offset=10, size=5)
+    profile.pop_frame()
+
+    events = frame_events(render(profile, endValue=15))
+    assert ("C", "B", 10) in events
+
+
+def page(offset: int, size: int, elements: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(
+        locator=SimpleNamespace(offset=offset, size=size), fNElements=elements
+    )
+
+
+def test_cluster_pages_drops_repeated_pages():
+    # pageLocations is [cluster][column][page]
+    envelopes = [
+        SimpleNamespace(
+            pageLocations=[
+                [
+                    # repeated within a column
+                    [page(0, 10, 1), page(10, 10, 2), page(0, 10, 3)],
+                    # repeated from column 0, plus one of the same offset but another size
+                    [page(10, 10, 4), page(10, 5, 5)],
+                ],
+                [
+                    # repeated from cluster 0
+                    [page(0, 10, 6), page(100, 10, 7)],
+                    # every page repeated, so the column is dropped
+                    [page(10, 5, 8)],
+                ],
+            ]
+        ),
+        # a second envelope continues the cluster numbering
+        SimpleNamespace(pageLocations=[[[page(200, 20, 9)], [page(100, 10, 10)]]]),
+    ]
+
+    clusters = cluster_pages(envelopes)
+    assert clusters == [
+        {
+            0: [PageData(0, 0, 10, 1), PageData(0, 10, 10, 2)],
+            1: [PageData(0, 10, 5, 5)],
+        },
+        {0: [PageData(1, 100, 10, 7)]},
+        {0: [PageData(2, 200, 20, 9)]},
+    ]
+
+
+def test_cluster_pages_without_pages():
+    envelopes = [SimpleNamespace(pageLocations=[[[], []]])]
+    assert cluster_pages(envelopes) == [{}]
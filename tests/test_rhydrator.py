@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+from rhydrator.rhydrator import print_members_recursive
+
+
+@dataclass
+class Leaf:
+    name: str
+    values: list[int]
+
+
+@dataclass
+class Node:
+    name: str
+    children: list[object] = field(default_factory=list)
+
+
+def printed(obj: object, capsys) -> str:
+    print_members_recursive(obj)
+    # drop the color codes
+    return re.sub(r"\033\[[0-9;]*m", "", capsys.readouterr().out)
+
+
+def test_print_members_shared_object_prints_in_full(capsys):
+    shared = Leaf("shared", [1, 1])
+    out = printed(Node("root", [shared, shared]), capsys)
+    assert "<recursion detected>" not in out
+    assert out.count("name = 'shared'") == 2
+    assert out.count("values = [2 item list of int]:") == 2
+
+
+def test_print_members_reports_cycle(capsys):
+    root = Node("root")
+    root.children.append(Node("child", [root]))
+    out = printed(root, capsys)
+    assert out.count("<recursion detected>") == 1
+    assert out.count("name = 'root'") == 1
+    assert "name = 'child'" in out